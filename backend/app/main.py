@@ -1,11 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 
 from .routers import health, documents, rag, compliance, risk, anomalies, alerts, reports, chat
 from .services.document_service import get_all_documents
-from .services.rag_service import index_document
+from .services.rag_service import index_document, index_documents_bulk
 from .services.bank_docs_service import index_bank_documents
 
 # Configure logging
@@ -14,49 +16,112 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Startup
-    logging.info("ML Project API starting up...")
-    
-    # Load or build PDF RAG index
+def _build_pdf_index_if_needed():
+    """Build the PDF RAG index if it could not be loaded from disk."""
     try:
-        from .services.pdf_rag_service import load_index, build_index
-        if not load_index():
-            logging.info("No existing RAG index found, building new index...")
-            result = build_index()
-            if result.get("status") == "success":
-                logging.info(f"Built RAG index: {result.get('num_chunks', 0)} chunks from {result.get('num_documents', 0)} documents")
-        else:
-            logging.info("Loaded existing RAG index")
+        from .services.pdf_rag_service import build_index
+        logging.info("No existing RAG index found, building new index...")
+        result = build_index()
+        if result.get("status") == "success":
+            logging.info(f"Built RAG index: {result.get('num_chunks', 0)} chunks from {result.get('num_documents', 0)} documents")
     except Exception as e:
-        logging.warning(f"Error loading/building PDF RAG index: {e}")
-    
-    # Index bank documents from bank_docs directory (legacy)
+        logging.warning(f"Error building PDF RAG index: {e}")
+
+
+def _index_bank_docs():
+    """Index legacy bank documents from the bank_docs directory."""
     try:
         count = index_bank_documents()
         logging.info(f"Indexed {count} bank documents from bank_docs directory")
     except Exception as e:
         logging.warning(f"Error indexing bank documents: {e}")
-    
-    # Reload existing uploaded documents into RAG index
+
+
+# Parallelism for the per-document reindex fallback
+_REINDEX_CONCURRENCY = 8
+
+
+async def _reload_uploaded_docs():
+    """Reload existing uploaded documents into the RAG index."""
     try:
         documents = get_all_documents()
-        for doc_id, metadata in documents.items():
-            text = metadata.get("text", "")
-            if text:
-                index_document(doc_id, text)
-                logging.info(f"Reloaded document {doc_id} into RAG index")
+        items = [(doc_id, metadata.get("text", "")) for doc_id, metadata in documents.items()
+                 if metadata.get("text")]
+        if not items:
+            return
+
+        count = await asyncio.to_thread(index_documents_bulk, items)
+        if count:
+            logging.info(f"Reloaded {count} documents into RAG index")
+            return
+
+        # Bulk embedding failed: index per document, bounded by a
+        # semaphore so the embedder is not flooded
+        sem = asyncio.Semaphore(_REINDEX_CONCURRENCY)
+
+        async def _index_one(doc_id: str, text: str):
+            async with sem:
+                await asyncio.to_thread(index_document, doc_id, text)
+
+        await asyncio.gather(*(_index_one(doc_id, text) for doc_id, text in items))
+        logging.info(f"Reloaded {len(items)} documents into RAG index (per-document fallback)")
     except Exception as e:
         logging.warning(f"Error reloading documents into RAG: {e}")
-    
+
+
+def _warm_models():
+    """Load the embedding model and OpenAI client before the first query."""
+    try:
+        from .services.pdf_rag_service import warmup
+        warmup()
+    except Exception as e:
+        logging.warning(f"Error warming RAG models: {e}")
+
+
+async def _warmup(pdf_index_loaded: bool):
+    """Run the independent index warmup phases concurrently off the event loop."""
+    tasks = []
+    if not pdf_index_loaded:
+        tasks.append(asyncio.to_thread(_build_pdf_index_if_needed))
+    tasks.append(asyncio.to_thread(_warm_models))
+    tasks.append(asyncio.to_thread(_index_bank_docs))
+    tasks.append(_reload_uploaded_docs())
+    await asyncio.gather(*tasks)
+    logging.info("Index warmup complete")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup
+    logging.info("ML Project API starting up...")
+
+    # Try to load the PDF RAG index from disk (fast path); anything that
+    # needs embedding work runs in a background warmup task so the API
+    # accepts traffic immediately.
+    pdf_index_loaded = False
+    try:
+        from .services.pdf_rag_service import load_index
+        pdf_index_loaded = load_index()
+        if pdf_index_loaded:
+            logging.info("Loaded existing RAG index")
+    except Exception as e:
+        logging.warning(f"Error loading PDF RAG index: {e}")
+
+    # Endpoints that need the index can `await app.state.warmup_task`
+    app.state.warmup_task = asyncio.create_task(_warmup(pdf_index_loaded))
+
     yield
-    
+
     # Shutdown (if needed)
+    if not app.state.warmup_task.done():
+        app.state.warmup_task.cancel()
     logging.info("ML Project API shutting down...")
 
 
-app = FastAPI(title="ML Project API", version="1.0.0", lifespan=lifespan)
+# orjson serializes the large list payloads (documents, anomalies, alerts)
+# several times faster than stdlib json and handles datetimes/np floats natively
+app = FastAPI(title="ML Project API", version="1.0.0", lifespan=lifespan,
+              default_response_class=ORJSONResponse)
 
 # CORS middleware
 app.add_middleware(
@@ -81,4 +146,7 @@ app.include_router(chat.router)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    # loop="auto" picks uvloop (and http="auto" httptools) when installed,
+    # which is 2-4x faster on I/O-heavy endpoints; both fall back cleanly
+    # on Windows where uvloop is unavailable
+    uvicorn.run("app.main:app", host="127.0.0.1", port=8000, loop="auto", http="auto")
@@ -1,13 +1,12 @@
 from fastapi import APIRouter
-from ..models import AlertsResponse, Alert
 from ..services.alert_service import get_alerts
 
 router = APIRouter()
 
 
-@router.get("/api/alerts", response_model=AlertsResponse)
+@router.get("/api/alerts")
 async def get_alerts_endpoint():
     """Get all alerts."""
+    # Serialize the alert dicts directly; no Pydantic round-trip
     alerts_data = get_alerts()
-    alerts = [Alert(**alert) for alert in alerts_data]
-    return AlertsResponse(alerts=alerts, total=len(alerts))
+    return {"alerts": alerts_data, "total": len(alerts_data)}
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from typing import List, Dict, Any
 
 from ..services.pdf_rag_service import query_rag, build_index, get_index_status
+from ..services.query_cache import query_cache, semantic_cache
 
 router = APIRouter()
 
@@ -30,10 +33,34 @@ class IndexStatusResponse(BaseModel):
 
 
 @router.post("/api/chat/ask", response_model=ChatResponse)
-async def ask_question(request: ChatRequest):
+async def ask_question(request: ChatRequest, http_request: Request):
     """Ask a question to the RAG chatbot."""
     try:
-        result = query_rag(request.question)
+        # Wait for startup warmup to finish (no-op once complete) so the
+        # index is fully populated before querying.
+        warmup_task = getattr(http_request.app.state, "warmup_task", None)
+        if warmup_task is not None and not warmup_task.done():
+            await warmup_task
+
+        # Serve repeated questions from the query cache: exact match
+        # first, then the semantic (LSH) tier for rephrased questions
+        cache_key = query_cache.make_key(request.question)
+        result = query_cache.get(cache_key)
+        if result is None:
+            # Encode off the event loop, through the query-embedding LRU
+            from ..services.pdf_rag_service import _encode_query
+            query_embedding = (await asyncio.to_thread(_encode_query, request.question))[0]
+            result = semantic_cache.get(query_embedding)
+            if result is not None:
+                query_cache.set(cache_key, result)
+            else:
+                result = await query_rag(request.question)
+                # Failure payloads carry an error flag; never cache them,
+                # or a transient hiccup is replayed for the full TTL --
+                # and via the LSH tier, for every nearby rephrasing too
+                if not result.get("error"):
+                    query_cache.set(cache_key, result)
+                    semantic_cache.set(query_embedding, result)
         
         # Convert sources to Source models
         sources = [
@@ -61,6 +88,9 @@ async def reindex_documents():
         result = build_index()
         if result.get("status") == "error":
             raise HTTPException(status_code=400, detail=result.get("message", "Indexing failed"))
+        # The index changed, so cached answers are stale
+        query_cache.bump_index_version()
+        semantic_cache.clear()
         return result
     except HTTPException:
         raise
@@ -68,6 +98,12 @@ async def reindex_documents():
         raise HTTPException(status_code=500, detail=f"Error rebuilding index: {str(e)}")
 
 
+@router.get("/api/chat/cache_stats")
+async def get_cache_stats():
+    """Get hit/miss/eviction counters for the query caches."""
+    return {"exact": query_cache.stats(), "semantic": semantic_cache.stats()}
+
+
 @router.get("/api/chat/status", response_model=IndexStatusResponse)
 async def get_status():
     """Get the status of the RAG index."""
@@ -1,6 +1,10 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from typing import List
+from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
+from typing import Any, Dict, List
+import asyncio
+import hashlib
 import uuid
+import aiofiles
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import logging
@@ -14,6 +18,8 @@ from ..services.document_service import (
     analyze_document,
     get_safe_filename,
     delete_document,
+    find_document_by_hash,
+    register_document_hash,
     UPLOADS_DIR
 )
 from ..services.rag_service import index_document
@@ -27,121 +33,180 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def process_upload(file_path: Path, filename: str, safe_filename: str, document_id: str) -> Dict[str, Any]:
+    """Run the synchronous, CPU-heavy part of an upload (extraction,
+    analysis, compliance, risk, anomalies, metadata save).
+
+    Called via asyncio.to_thread so the event loop stays free.
+    """
+    # Extract text
+    text, error = extract_text_from_file(file_path, filename)
+
+    if error:
+        return {"text": "", "error": error, "analysis": None}
+
+    # Analysis, compliance and anomaly detection are independent of each
+    # other, so overlap them on a small thread pool; only the risk score
+    # needs the violations result
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        analysis_future = pool.submit(analyze_document, text)
+        violations_future = pool.submit(check_compliance, text)
+        document_anomalies_future = pool.submit(detect_document_anomalies, text, filename)
+
+        # Detect anomalies for CSV files
+        csv_anomalies_future = None
+        if Path(filename).suffix.lower() == '.csv':
+            csv_anomalies_future = pool.submit(detect_csv_anomalies, file_path, filename)
+
+        analysis = analysis_future.result()
+        violations = violations_future.result()
+        document_anomalies = document_anomalies_future.result()
+        csv_anomalies = csv_anomalies_future.result() if csv_anomalies_future else None
+
+    if csv_anomalies is not None:
+        logger.info(f"Detected {csv_anomalies.get('anomaly_count', 0)} anomalies in CSV file")
+    logger.info(f"Detected {document_anomalies.get('anomaly_count', 0)} anomalies in document")
+
+    # Calculate risk score
+    risk_score = calculate_risk_score(document_id, text, violations)
+
+    # Store metadata
+    metadata = {
+        "document_id": document_id,
+        "filename": filename,
+        "safe_filename": safe_filename,
+        "uploaded_at": datetime.now().isoformat(),
+        "text_length": len(text),
+        "file_type": Path(filename).suffix,
+        "analysis": analysis,
+        "violations": violations,
+        "risk_score": risk_score,
+        "csv_anomalies": csv_anomalies,  # Store CSV-specific anomalies
+        "document_anomalies": document_anomalies,  # Store general document anomalies
+        "text": text  # Store text for later retrieval
+    }
+
+    save_document_metadata(document_id, metadata)
+
+    # Delete physical file after processing (keep only metadata and text)
+    try:
+        if file_path.exists():
+            file_path.unlink()
+            logger.info(f"Physical file deleted after processing: {file_path}")
+    except Exception as e:
+        logger.warning(f"Could not delete physical file: {e}")
+
+    return {"text": text, "error": None, "analysis": analysis}
+
+
+def _auto_generate_report():
+    """Generate a report after an upload, swallowing failures."""
+    try:
+        from ..services.report_service import generate_report
+        report_result = generate_report()
+        logger.info(f"Auto-generated report: {report_result.get('report_id')}")
+    except Exception as e:
+        logger.warning(f"Could not auto-generate report: {e}")
+
+
 @router.post("/api/documents/upload", response_model=DocumentUploadResponse)
-async def upload_document(file: UploadFile = File(...)):
+async def upload_document(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
     """Upload and process a document."""
     try:
         # Generate document ID
         document_id = str(uuid.uuid4())
-        
-        # Save file
+
+        # Save file: stream in 1 MiB chunks so peak memory stays bounded
+        # regardless of file size, hashing the content along the way
         safe_filename = get_safe_filename(file.filename)
         file_path = UPLOADS_DIR / safe_filename
-        
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-        
-        logger.info(f"File saved: {file_path}")
-        
-        # Extract text
-        text, error = extract_text_from_file(file_path, file.filename)
-        
-        if error:
+
+        hasher = hashlib.sha256()
+        async with aiofiles.open(file_path, "wb") as f:
+            while chunk := await file.read(1 << 20):
+                hasher.update(chunk)
+                await f.write(chunk)
+        content_hash = hasher.hexdigest()
+
+        logger.info(f"File saved: {file_path} (sha256 {content_hash[:12]})")
+
+        # Identical content was already processed: reuse the stored result
+        # and skip extraction, analysis and indexing entirely
+        existing_id = find_document_by_hash(content_hash)
+        if existing_id:
+            try:
+                if file_path.exists():
+                    file_path.unlink()
+            except Exception as e:
+                logger.warning(f"Could not delete duplicate file: {e}")
+            metadata = load_document_metadata(existing_id)
+            logger.info(f"Duplicate upload of {file.filename}, reusing document {existing_id}")
+            return DocumentUploadResponse(
+                document_id=existing_id,
+                filename=file.filename,
+                message="Duplicate of an already-uploaded document; returning existing analysis",
+                text_length=metadata.get("text_length", 0),
+                analysis=metadata.get("analysis")
+            )
+
+        # Heavy processing runs in a worker thread so concurrent requests
+        # are not blocked by PDF parsing or compliance scans
+        result = await asyncio.to_thread(process_upload, file_path, file.filename, safe_filename, document_id)
+
+        if result["error"]:
             return DocumentUploadResponse(
                 document_id=document_id,
                 filename=file.filename,
-                message=error,
+                message=result["error"],
                 text_length=0
             )
-        
-        # Analyze document
-        analysis = analyze_document(text)
-        
-        # Check compliance
-        violations = check_compliance(text)
-        
-        # Calculate risk score
-        risk_score = calculate_risk_score(document_id, text, violations)
-        
-        # Detect anomalies for CSV files
-        csv_anomalies = None
-        if Path(file.filename).suffix.lower() == '.csv':
-            csv_anomalies = detect_csv_anomalies(file_path, file.filename)
-            logger.info(f"Detected {csv_anomalies.get('anomaly_count', 0)} anomalies in CSV file")
-        
-        # Detect anomalies for ALL document types
-        document_anomalies = detect_document_anomalies(text, file.filename)
-        logger.info(f"Detected {document_anomalies.get('anomaly_count', 0)} anomalies in document")
-        
-        # Store metadata
-        metadata = {
-            "document_id": document_id,
-            "filename": file.filename,
-            "safe_filename": safe_filename,
-            "uploaded_at": datetime.now().isoformat(),
-            "text_length": len(text),
-            "file_type": Path(file.filename).suffix,
-            "analysis": analysis,
-            "violations": violations,
-            "risk_score": risk_score,
-            "csv_anomalies": csv_anomalies,  # Store CSV-specific anomalies
-            "document_anomalies": document_anomalies,  # Store general document anomalies
-            "text": text  # Store text for later retrieval
-        }
-        
-        save_document_metadata(document_id, metadata)
-        
-        # Index for RAG
-        index_document(document_id, text)
-        
-        # Delete physical file after processing (keep only metadata and text)
-        try:
-            if file_path.exists():
-                file_path.unlink()
-                logger.info(f"Physical file deleted after processing: {file_path}")
-        except Exception as e:
-            logger.warning(f"Could not delete physical file: {e}")
-        
-        # Generate report automatically after document processing
-        try:
-            from ..services.report_service import generate_report
-            report_result = generate_report()
-            logger.info(f"Auto-generated report: {report_result.get('report_id')}")
-        except Exception as e:
-            logger.warning(f"Could not auto-generate report: {e}")
-        
+
+        text = result["text"]
+
+        # Register the content hash so re-uploads short-circuit
+        register_document_hash(content_hash, document_id)
+
+        # New document data invalidates cached alerts
+        from ..services.alert_service import invalidate_alerts
+        invalidate_alerts()
+
+        # RAG indexing and report generation are not needed for the
+        # response; run them after it is sent
+        background_tasks.add_task(index_document, document_id, text)
+        background_tasks.add_task(_auto_generate_report)
+
         logger.info(f"Document processed: {document_id}")
-        
+
         return DocumentUploadResponse(
             document_id=document_id,
             filename=file.filename,
             message="Document uploaded and processed successfully",
             text_length=len(text),
-            analysis=analysis
+            analysis=result["analysis"]
         )
     except Exception as e:
         logger.error(f"Upload error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/api/documents", response_model=List[DocumentMetadata])
+@router.get("/api/documents")
 async def list_documents():
     """List all documents."""
     documents = get_all_documents()
-    result = []
-    
-    for doc_id, metadata in documents.items():
-        result.append(DocumentMetadata(
-            document_id=doc_id,
-            filename=metadata.get("filename", ""),
-            uploaded_at=metadata.get("uploaded_at", ""),
-            text_length=metadata.get("text_length", 0),
-            file_type=metadata.get("file_type", ""),
-            analysis=metadata.get("analysis")
-        ))
-    
-    return result
+
+    # Plain dicts serialize straight through orjson without a Pydantic
+    # model per document
+    return [
+        {
+            "document_id": doc_id,
+            "filename": metadata.get("filename", ""),
+            "uploaded_at": metadata.get("uploaded_at", ""),
+            "text_length": metadata.get("text_length", 0),
+            "file_type": metadata.get("file_type", ""),
+            "analysis": metadata.get("analysis")
+        }
+        for doc_id, metadata in documents.items()
+    ]
 
 
 @router.get("/api/documents/{document_id}", response_model=DocumentMetadata)
@@ -174,14 +239,14 @@ async def delete_document_endpoint(document_id: str):
     
     # Also remove from RAG index
     try:
-        from ..services.rag_service import _embeddings_cache, _documents_cache
-        # Remove chunks for this document
-        keys_to_remove = [k for k in _embeddings_cache.keys() if k.startswith(f"{document_id}_chunk_")]
-        for key in keys_to_remove:
-            _embeddings_cache.pop(key, None)
-            _documents_cache.pop(key, None)
-        logger.info(f"Removed {len(keys_to_remove)} chunks from RAG index")
+        from ..services.rag_service import remove_document
+        removed = remove_document(document_id)
+        logger.info(f"Removed {removed} chunks from RAG index")
     except Exception as e:
         logger.warning(f"Error removing from RAG index: {e}")
+
+    # Alerts referencing this document are now stale
+    from ..services.alert_service import invalidate_alerts
+    invalidate_alerts()
     
     return {"message": "Document deleted successfully", "document_id": document_id}
@@ -1,26 +1,38 @@
 from typing import List, Dict, Any
 from datetime import datetime
+import time
 import logging
 from ..services.risk_service import get_all_risk_scores
 from ..services.anomaly_service import detect_anomalies
 
 logger = logging.getLogger(__name__)
 
+ALERTS_TTL_SECONDS = 60.0
+
 _alerts_cache: List[Dict[str, Any]] = []
+_alerts_ts: float = 0.0  # monotonic time of last generation; 0 forces refresh
+
+
+def invalidate_alerts():
+    """Force alert regeneration on the next get_alerts() call."""
+    global _alerts_ts
+    _alerts_ts = 0.0
 
 
 def generate_alerts():
     """Generate alerts based on risk scores and anomalies from all documents."""
-    global _alerts_cache
+    global _alerts_cache, _alerts_ts
     _alerts_cache = []
-    
+
+    # Load document metadata once for all loops below
+    from ..services.document_service import get_all_documents
+    all_docs = get_all_documents()
+
     # Check high-risk documents
     risk_scores = get_all_risk_scores()
     for score_data in risk_scores:
         if score_data["score"] >= 70:
-            from ..services.document_service import load_document_metadata
-            metadata = load_document_metadata(score_data["document_id"])
-            filename = metadata.get("filename", "Unknown") if metadata else "Unknown"
+            filename = all_docs.get(score_data["document_id"], {}).get("filename", "Unknown")
             _alerts_cache.append({
                 "alert_id": f"risk_{score_data['document_id']}",
                 "type": "high_risk",
@@ -44,12 +56,10 @@ def generate_alerts():
     
     # Check anomalies from uploaded documents
     from ..services.document_anomaly_aggregator import get_all_document_anomalies
-    from ..services.document_service import load_document_metadata
     doc_anomalies = get_all_document_anomalies()
     for anomaly in doc_anomalies[:10]:  # Limit to top 10
         if anomaly.get("anomaly_type", "").startswith("Document:"):
-            metadata = load_document_metadata(anomaly.get("document_id"))
-            filename = metadata.get("filename", "Unknown") if metadata else "Unknown"
+            filename = all_docs.get(anomaly.get("document_id"), {}).get("filename", "Unknown")
             _alerts_cache.append({
                 "alert_id": f"doc_anomaly_{anomaly['document_id']}",
                 "type": "document_anomaly",
@@ -59,9 +69,11 @@ def generate_alerts():
                 "document_id": anomaly.get("document_id")
             })
 
+    _alerts_ts = time.monotonic()
+
 
 def get_alerts() -> List[Dict[str, Any]]:
-    """Get all alerts."""
-    if not _alerts_cache:
+    """Get all alerts, regenerating when stale or invalidated."""
+    if _alerts_ts == 0.0 or time.monotonic() - _alerts_ts >= ALERTS_TTL_SECONDS:
         generate_alerts()
     return _alerts_cache
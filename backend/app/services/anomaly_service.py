@@ -9,62 +9,75 @@ logger = logging.getLogger(__name__)
 DATA_DIR = Path(__file__).parent.parent.parent.parent / "data"
 TRANSACTIONS_FILE = DATA_DIR / "transactions.csv"
 
+# Only the columns the anomaly pass actually reads
+_USED_COLUMNS = {'amount', 'transaction_id', 'id', 'date', 'timestamp', 'customer_id'}
+
+# Memoized result keyed on (st_mtime_ns, st_size) of transactions.csv
+_cache: Dict[str, Any] = {}
+
 
 def detect_anomalies() -> List[Dict[str, Any]]:
     """Detect anomalies in transactions using z-score and IQR."""
     if not TRANSACTIONS_FILE.exists():
         logger.warning(f"Transactions file not found: {TRANSACTIONS_FILE}")
         return []
-    
+
     try:
-        df = pd.read_csv(TRANSACTIONS_FILE)
-        
+        # The file only changes when re-uploaded, so reuse the previous
+        # result as long as mtime and size are unchanged
+        stat = TRANSACTIONS_FILE.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+        if _cache.get('key') == key:
+            return _cache['result']
+
+        df = pd.read_csv(TRANSACTIONS_FILE, usecols=lambda c: c in _USED_COLUMNS)
+
         if 'amount' not in df.columns:
             logger.warning("'amount' column not found in transactions.csv")
             return []
         
-        anomalies = []
-        
-        # Z-score method
-        mean_amount = df['amount'].mean()
-        std_amount = df['amount'].std()
-        
+        amounts = df['amount'].to_numpy(dtype=float)
+
+        # Z-score method (vectorized)
+        mean_amount = amounts.mean()
+        std_amount = amounts.std(ddof=1) if len(amounts) > 1 else 0.0
+
         if std_amount > 0:
-            df['z_score'] = (df['amount'] - mean_amount) / std_amount
-            z_anomalies = df[abs(df['z_score']) > 2.5]
-            
-            for _, row in z_anomalies.iterrows():
-                anomalies.append({
-                    "transaction_id": str(row.get('transaction_id', row.get('id', 'unknown'))),
-                    "amount": float(row['amount']),
-                    "date": str(row.get('date', row.get('timestamp', 'unknown'))),
-                    "customer_id": str(row.get('customer_id', 'unknown')),
-                    "anomaly_type": "z-score outlier",
-                    "z_score": float(row['z_score'])
-                })
-        
-        # IQR method
-        Q1 = df['amount'].quantile(0.25)
-        Q3 = df['amount'].quantile(0.75)
-        IQR = Q3 - Q1
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
-        
-        iqr_anomalies = df[(df['amount'] < lower_bound) | (df['amount'] > upper_bound)]
-        
-        for _, row in iqr_anomalies.iterrows():
-            trans_id = str(row.get('transaction_id', row.get('id', 'unknown')))
-            # Avoid duplicates
-            if not any(a['transaction_id'] == trans_id for a in anomalies):
-                anomalies.append({
-                    "transaction_id": trans_id,
-                    "amount": float(row['amount']),
-                    "date": str(row.get('date', row.get('timestamp', 'unknown'))),
-                    "customer_id": str(row.get('customer_id', 'unknown')),
-                    "anomaly_type": "IQR outlier",
-                    "z_score": float((row['amount'] - mean_amount) / std_amount) if std_amount > 0 else 0.0
-                })
-        
+            z_scores = (amounts - mean_amount) / std_amount
+        else:
+            z_scores = np.zeros_like(amounts)
+        z_mask = np.abs(z_scores) > 2.5
+
+        # IQR method (vectorized)
+        q1, q3 = np.quantile(amounts, [0.25, 0.75])
+        iqr = q3 - q1
+        iqr_mask = (amounts < q1 - 1.5 * iqr) | (amounts > q3 + 1.5 * iqr)
+
+        # One combined mask; z-score outliers take precedence for the label
+        mask = z_mask | iqr_mask
+        if not mask.any():
+            _cache['key'], _cache['result'] = key, []
+            return []
+
+        anomaly_types = np.where(z_mask, "z-score outlier", "IQR outlier")
+
+        id_col = df['transaction_id'] if 'transaction_id' in df.columns else df.get('id')
+        date_col = df['date'] if 'date' in df.columns else df.get('timestamp')
+        customer_col = df.get('customer_id')
+
+        selected = np.flatnonzero(mask)
+        anomalies = []
+        for i in selected:
+            anomalies.append({
+                "transaction_id": str(id_col.iloc[i]) if id_col is not None else 'unknown',
+                "amount": float(amounts[i]),
+                "date": str(date_col.iloc[i]) if date_col is not None else 'unknown',
+                "customer_id": str(customer_col.iloc[i]) if customer_col is not None else 'unknown',
+                "anomaly_type": str(anomaly_types[i]),
+                "z_score": float(z_scores[i])
+            })
+
+        _cache['key'], _cache['result'] = key, anomalies
         return anomalies
     except Exception as e:
         logger.error(f"Error detecting anomalies: {e}")
@@ -3,7 +3,7 @@ import logging
 from pathlib import Path
 from typing import List, Dict, Any
 from .document_service import extract_text_from_file
-from .rag_service import index_document
+from .rag_service import index_documents_bulk
 
 logger = logging.getLogger(__name__)
 
@@ -42,12 +42,11 @@ def load_bank_documents() -> List[Dict[str, Any]]:
 def index_bank_documents():
     """Index all bank documents for RAG."""
     documents = load_bank_documents()
-    
-    for doc in documents:
-        try:
-            index_document(doc["document_id"], doc["text"])
-            logger.info(f"Indexed bank document: {doc['filename']}")
-        except Exception as e:
-            logger.error(f"Error indexing bank document {doc['filename']}: {e}")
-    
+
+    try:
+        # Single batched embedding call for all bank documents
+        index_documents_bulk([(doc["document_id"], doc["text"]) for doc in documents])
+    except Exception as e:
+        logger.error(f"Error indexing bank documents: {e}")
+
     return len(documents)
@@ -1,22 +1,48 @@
 import os
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import logging
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 logger = logging.getLogger(__name__)
 
 DATA_DIR = Path(__file__).parent.parent.parent.parent / "data"
 REGULATIONS_DIR = DATA_DIR / "regulations"
 
+# Indicators that the document talks about non-compliance. The regexes are
+# compiled once at import and anchored on word boundaries, with common
+# morphological variants folded into a single alternation so one search
+# replaces the old per-requirement substring scans.
+_NEGATIVE_KEYWORDS_RE = re.compile(
+    r'\b(?:violat(?:e[sd]?|ing|ion)|breach(?:es|ed)?|non[- ]compliance|fail(?:s|ure|ing|ed)?|missing)\b')
+_HIGH_SEVERITY_RE = re.compile(r'\b(?:violat(?:e[sd]?|ing|ion)|breach(?:es|ed)?)\b')
+_TOKEN_RE = re.compile(r'\w+')
+
+# The same variants spelled out for the automaton path, mapped to their
+# high-severity flag; must stay in lockstep with the two regexes above
+_NEGATIVE_VARIANTS = {
+    'violate': True, 'violates': True, 'violated': True, 'violating': True, 'violation': True,
+    'breach': True, 'breaches': True, 'breached': True,
+    'non-compliance': False, 'non compliance': False,
+    'fail': False, 'fails': False, 'failure': False, 'failing': False, 'failed': False,
+    'missing': False,
+}
+
 
 def load_regulations() -> Dict[str, str]:
     """Load all regulation markdown files."""
     regulations = {}
-    
+
     if not REGULATIONS_DIR.exists():
         REGULATIONS_DIR.mkdir(parents=True, exist_ok=True)
         return regulations
-    
+
     for md_file in REGULATIONS_DIR.glob("*.md"):
         try:
             with open(md_file, 'r', encoding='utf-8') as f:
@@ -25,47 +51,46 @@ def load_regulations() -> Dict[str, str]:
                 regulations[reg_id] = content
         except Exception as e:
             logger.error(f"Error loading regulation {md_file}: {e}")
-    
+
     return regulations
 
 
-def check_compliance(document_text: str) -> List[Dict[str, Any]]:
-    """Check document against regulations."""
-    violations = []
-    regulations = load_regulations()
-    
-    if not regulations:
-        return violations
-    
-    # Simple heuristic matching
-    document_lower = document_text.lower()
-    
-    for reg_id, reg_text in regulations.items():
-        # Extract requirement IDs and text from markdown
+def _regulations_mtime_key() -> Tuple:
+    """Fingerprint of the regulations directory, used to invalidate the parse cache."""
+    if not REGULATIONS_DIR.exists():
+        return ()
+    return tuple(sorted(
+        (md_file.name, md_file.stat().st_mtime_ns)
+        for md_file in REGULATIONS_DIR.glob("*.md")
+    ))
+
+
+def _finish_requirement(requirements: List[Dict[str, Any]], requirement_id: str, requirement_text: str):
+    """Append a pre-parsed requirement record with its match keywords."""
+    words = requirement_text.lower().split()
+    keywords = set(_TOKEN_RE.findall(" ".join(words[:10])))
+    requirements.append({
+        "requirement_id": requirement_id,
+        "requirement_text": requirement_text,
+        "keywords": keywords,
+        "first_word": words[0] if words else ""
+    })
+
+
+@lru_cache(maxsize=4)
+def _load_parsed_regulations(mtime_key: Tuple) -> Tuple[Dict[str, Any], ...]:
+    """Parse regulation markdown into requirement records, once per directory state."""
+    requirements = []
+
+    for reg_id, reg_text in load_regulations().items():
         lines = reg_text.split('\n')
         current_requirement = None
         requirement_text = ""
-        
+
         for line in lines:
             if line.startswith('##') or line.startswith('#'):
                 if current_requirement:
-                    # Check previous requirement
-                    if any(keyword in document_lower for keyword in requirement_text.lower().split()[:10]):
-                        # Check if it's a violation (simple heuristic: negative keywords)
-                        negative_keywords = ['violate', 'breach', 'non-compliance', 'fail', 'missing']
-                        if any(nkw in document_lower for nkw in negative_keywords):
-                            # Find evidence snippet
-                            evidence_start = max(0, document_lower.find(requirement_text.lower().split()[0]) - 50)
-                            evidence_end = min(len(document_text), evidence_start + 200)
-                            evidence = document_text[evidence_start:evidence_end]
-                            
-                            violations.append({
-                                "requirement_id": current_requirement,
-                                "requirement_text": requirement_text[:200],
-                                "evidence": evidence,
-                                "severity": "high" if any(nkw in document_lower for nkw in ['violate', 'breach']) else "medium"
-                            })
-                
+                    _finish_requirement(requirements, current_requirement, requirement_text)
                 # Start new requirement
                 if line.startswith('##'):
                     current_requirement = line.replace('#', '').strip()
@@ -74,21 +99,101 @@ def check_compliance(document_text: str) -> List[Dict[str, Any]]:
                     current_requirement = None
             elif current_requirement:
                 requirement_text += " " + line
-        
-        # Check last requirement
+
         if current_requirement:
-            if any(keyword in document_lower for keyword in requirement_text.lower().split()[:10]):
-                negative_keywords = ['violate', 'breach', 'non-compliance', 'fail', 'missing']
-                if any(nkw in document_lower for nkw in negative_keywords):
-                    evidence_start = max(0, document_lower.find(requirement_text.lower().split()[0]) - 50)
-                    evidence_end = min(len(document_text), evidence_start + 200)
-                    evidence = document_text[evidence_start:evidence_end]
-                    
-                    violations.append({
-                        "requirement_id": current_requirement,
-                        "requirement_text": requirement_text[:200],
-                        "evidence": evidence,
-                        "severity": "high" if any(nkw in document_lower for nkw in ['violate', 'breach']) else "medium"
-                    })
-    
+            _finish_requirement(requirements, current_requirement, requirement_text)
+
+    return tuple(requirements)
+
+
+def get_parsed_regulations() -> Tuple[Dict[str, Any], ...]:
+    """Get pre-parsed requirements, re-parsing only when the directory changes."""
+    return _load_parsed_regulations(_regulations_mtime_key())
+
+
+@lru_cache(maxsize=4)
+def _build_keyword_automaton(mtime_key: Tuple):
+    """Build one Aho-Corasick automaton over all requirement and negative keywords.
+
+    A single pass over the document then locates every keyword for every
+    requirement at once. Values are (requirement_indices, is_negative, is_high).
+    """
+    if ahocorasick is None:
+        return None
+
+    keyword_to_reqs: Dict[str, set] = {}
+    for idx, requirement in enumerate(_load_parsed_regulations(mtime_key)):
+        for keyword in requirement["keywords"]:
+            keyword_to_reqs.setdefault(keyword, set()).add(idx)
+
+    automaton = ahocorasick.Automaton()
+    for keyword in set(keyword_to_reqs) | set(_NEGATIVE_VARIANTS):
+        automaton.add_word(keyword, (
+            keyword,
+            tuple(keyword_to_reqs.get(keyword, ())),
+            keyword in _NEGATIVE_VARIANTS,
+            _NEGATIVE_VARIANTS.get(keyword, False)
+        ))
+    automaton.make_automaton()
+    return automaton
+
+
+def check_compliance(document_text: str) -> List[Dict[str, Any]]:
+    """Check document against regulations."""
+    violations = []
+    requirements = get_parsed_regulations()
+
+    if not requirements:
+        return violations
+
+    # One lowercase pass over the whole document
+    document_lower = document_text.lower()
+
+    automaton = _build_keyword_automaton(_regulations_mtime_key())
+    if automaton is not None:
+        # Single Aho-Corasick pass finds requirement and negative keywords
+        # for all regulations simultaneously
+        matched_requirements = set()
+        negative_hit = False
+        high_severity = False
+        for end, (keyword, req_indices, is_negative, is_high) in automaton.iter(document_lower):
+            # All keywords are token-like: require word boundaries on both
+            # sides, matching the \b anchoring of the regex fallback (so
+            # e.g. "unbreachable" does not count as a negative hit)
+            start = end - len(keyword) + 1
+            before = document_lower[start - 1] if start > 0 else " "
+            after = document_lower[end + 1] if end + 1 < len(document_lower) else " "
+            if before.isalnum() or before == "_" or after.isalnum() or after == "_":
+                continue
+            if is_negative:
+                negative_hit = True
+                high_severity = high_severity or is_high
+            if req_indices:
+                matched_requirements.update(req_indices)
+        if not negative_hit:
+            return violations
+        severity = "high" if high_severity else "medium"
+        matched = [requirements[i] for i in sorted(matched_requirements)]
+    else:
+        # Fallback: token-set intersection per requirement
+        if not _NEGATIVE_KEYWORDS_RE.search(document_lower):
+            return violations
+        severity = "high" if _HIGH_SEVERITY_RE.search(document_lower) else "medium"
+        tokens = set(_TOKEN_RE.findall(document_lower))
+        matched = [r for r in requirements if r["keywords"] & tokens]
+
+    for requirement in matched:
+
+        # Find evidence snippet
+        evidence_start = max(0, document_lower.find(requirement["first_word"]) - 50)
+        evidence_end = min(len(document_text), evidence_start + 200)
+        evidence = document_text[evidence_start:evidence_end]
+
+        violations.append({
+            "requirement_id": requirement["requirement_id"],
+            "requirement_text": requirement["requirement_text"][:200],
+            "evidence": evidence,
+            "severity": severity
+        })
+
     return violations
@@ -9,39 +9,40 @@ def get_all_document_anomalies() -> List[Dict[str, Any]]:
     """Get all anomalies from all uploaded documents."""
     documents = get_all_documents()
     all_anomalies = []
-    
+
     for doc_id, metadata in documents.items():
-        filename = metadata.get("filename", "Unknown")
-        
+        # Fields shared by every record of this document, built once
+        base = {
+            "document_id": doc_id,
+            "filename": metadata.get("filename", "Unknown"),
+            "date": metadata.get("uploaded_at", "unknown"),
+            "customer_id": f"doc_{doc_id}",
+        }
+
         # CSV anomalies
-        csv_anomalies = metadata.get("csv_anomalies", {})
+        csv_anomalies = metadata.get("csv_anomalies")
         if csv_anomalies and csv_anomalies.get("anomalies"):
             for anomaly in csv_anomalies["anomalies"]:
                 all_anomalies.append({
-                    "document_id": doc_id,
-                    "filename": filename,
+                    **base,
                     "transaction_id": f"{doc_id}_{anomaly.get('row_index', 'unknown')}",
                     "amount": anomaly.get("value", 0.0),
-                    "date": metadata.get("uploaded_at", "unknown"),
-                    "customer_id": f"doc_{doc_id}",
                     "anomaly_type": f"CSV: {anomaly.get('anomaly_type', 'unknown')}",
                     "z_score": anomaly.get("z_score", 0.0)
                 })
-        
+
         # Document anomalies
-        doc_anomalies = metadata.get("document_anomalies", {})
+        doc_anomalies = metadata.get("document_anomalies")
         if doc_anomalies and doc_anomalies.get("anomalies"):
             for anomaly in doc_anomalies["anomalies"]:
-                if anomaly.get("severity") in ["high", "medium"]:
+                if anomaly.get("severity") in ("high", "medium"):
+                    anomaly_type = anomaly.get('anomaly_type', 'unknown')
                     all_anomalies.append({
-                        "document_id": doc_id,
-                        "filename": filename,
-                        "transaction_id": f"{doc_id}_anom_{anomaly.get('anomaly_type', 'unknown')}",
+                        **base,
+                        "transaction_id": f"{doc_id}_anom_{anomaly_type}",
                         "amount": 0.0,
-                        "date": metadata.get("uploaded_at", "unknown"),
-                        "customer_id": f"doc_{doc_id}",
-                        "anomaly_type": f"Document: {anomaly.get('anomaly_type', 'unknown')}",
+                        "anomaly_type": f"Document: {anomaly_type}",
                         "z_score": 0.0
                     })
-    
+
     return all_anomalies
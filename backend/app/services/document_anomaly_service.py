@@ -1,9 +1,68 @@
 import re
+from collections import Counter
 from typing import Dict, Any, List
 import logging
 
+import numpy as np
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 logger = logging.getLogger(__name__)
 
+# Suspicious keywords and risk phrases scanned in documents
+SUSPICIOUS_KEYWORDS = [
+    'fraud', 'fraudulent', 'scam', 'illegal', 'unauthorized', 'breach',
+    'hack', 'leak', 'stolen', 'stolen data', 'data breach', 'security breach',
+    'suspicious', 'unusual', 'irregular', 'anomaly', 'violation', 'non-compliance',
+    'penalty', 'fine', 'lawsuit', 'legal action', 'investigation', 'audit',
+    'money laundering', 'terrorist financing', 'sanctioned', 'blacklist'
+]
+
+HIGH_SEVERITY_KEYWORDS = {'fraud', 'breach', 'hack', 'leak'}
+
+RISK_PHRASES = [
+    'high risk', 'critical risk', 'immediate action required', 'urgent',
+    'confidential', 'classified', 'restricted', 'internal use only',
+    'do not distribute', 'forbidden', 'prohibited'
+]
+
+# Maximum anomaly records returned per document; counters keep reporting
+# the true totals beyond the cap
+_ANOMALY_CAP = 50
+
+
+def _build_keyword_automaton():
+    """One Aho-Corasick automaton over all keywords and risk phrases,
+    built once at import; a single sweep of the text replaces one full
+    scan per pattern."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in SUSPICIOUS_KEYWORDS:
+        severity = "high" if keyword in HIGH_SEVERITY_KEYWORDS else "medium"
+        automaton.add_word(keyword, (keyword, "suspicious_keyword", severity))
+    for phrase in RISK_PHRASES:
+        automaton.add_word(phrase, (phrase, "risk_phrase", "medium"))
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+# One fused pass for all PII-like patterns: credit cards, SSNs, emails
+# and large numbers, compiled once at module scope. Alternation order
+# puts the more specific numeric patterns first.
+_PII_RE = re.compile(
+    r'(?P<cc>\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b)'
+    r'|(?P<ssn>\b\d{3}-\d{2}-\d{4}\b)'
+    r'|(?P<email>\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b)'
+    r'|(?P<num>\b\d{6,}\b)',
+    re.ASCII
+)
+
 
 def detect_document_anomalies(text: str, filename: str) -> Dict[str, Any]:
     """Detect anomalies in any document text (PDF, DOCX, TXT, MD, etc.)."""
@@ -16,161 +75,209 @@ def detect_document_anomalies(text: str, filename: str) -> Dict[str, Any]:
     
     anomalies = []
     analysis_parts = []
-    
+    # The API returns at most _ANOMALY_CAP records; _add keeps the totals
+    # and severity counters accurate while skipping record construction
+    # once the cap is reached
+    total_anomalies = 0
+    severity_counts = {"high": 0, "medium": 0, "low": 0}
+
+    def _count(severity: str):
+        nonlocal total_anomalies
+        total_anomalies += 1
+        severity_counts[severity] += 1
+
+    def _add(record: Dict[str, Any]):
+        _count(record.get("severity", "low"))
+        if len(anomalies) < _ANOMALY_CAP:
+            anomalies.append(record)
+
     text_lower = text.lower()
     words = text.split()
     sentences = text.split('.')
     
-    # 1. Suspicious keywords detection
-    suspicious_keywords = [
-        'fraud', 'fraudulent', 'scam', 'illegal', 'unauthorized', 'breach',
-        'hack', 'leak', 'stolen', 'stolen data', 'data breach', 'security breach',
-        'suspicious', 'unusual', 'irregular', 'anomaly', 'violation', 'non-compliance',
-        'penalty', 'fine', 'lawsuit', 'legal action', 'investigation', 'audit',
-        'money laundering', 'terrorist financing', 'sanctioned', 'blacklist'
-    ]
-    
+    # 1. Suspicious keywords detection (single automaton sweep also
+    # collects the risk phrases used in section 11)
     found_suspicious = []
-    for keyword in suspicious_keywords:
-        count = text_lower.count(keyword.lower())
-        if count > 0:
+    found_risk_phrases = []
+
+    if _KEYWORD_AUTOMATON is not None:
+        keyword_positions: Dict[str, List[int]] = {}
+        risk_phrase_hits = set()
+        for end, (pattern, category, severity) in _KEYWORD_AUTOMATON.iter(text_lower):
+            if category == "suspicious_keyword":
+                keyword_positions.setdefault(pattern, []).append(end - len(pattern) + 1)
+            else:
+                risk_phrase_hits.add(pattern)
+
+        for keyword in SUSPICIOUS_KEYWORDS:
+            positions = keyword_positions.get(keyword)
+            if not positions:
+                continue
             found_suspicious.append({
                 "keyword": keyword,
-                "count": count
+                "count": len(positions)
             })
-            # Find context around keyword
-            pattern = re.compile(re.escape(keyword), re.IGNORECASE)
-            matches = list(pattern.finditer(text))
-            for match in matches[:3]:  # First 3 occurrences
-                start = max(0, match.start() - 100)
-                end = min(len(text), match.end() + 100)
+            severity = "high" if keyword in HIGH_SEVERITY_KEYWORDS else "medium"
+            for position in positions[:3]:  # First 3 occurrences
+                if len(anomalies) >= _ANOMALY_CAP:
+                    _count(severity)  # still counted, context skipped
+                    continue
+                start = max(0, position - 100)
+                end = min(len(text), position + len(keyword) + 100)
                 context = text[start:end].strip()
-                anomalies.append({
+                _add({
                     "anomaly_type": "suspicious_keyword",
                     "keyword": keyword,
                     "context": context,
-                    "position": match.start(),
-                    "severity": "high" if keyword in ['fraud', 'breach', 'hack', 'leak'] else "medium"
+                    "position": position,
+                    "severity": severity
                 })
-    
+
+        found_risk_phrases = [p for p in RISK_PHRASES if p in risk_phrase_hits]
+    else:
+        # Fallback: per-keyword scans
+        for keyword in SUSPICIOUS_KEYWORDS:
+            count = text_lower.count(keyword)
+            if count > 0:
+                found_suspicious.append({
+                    "keyword": keyword,
+                    "count": count
+                })
+                # Find context around keyword
+                pattern = re.compile(re.escape(keyword), re.IGNORECASE)
+                matches = list(pattern.finditer(text))
+                for match in matches[:3]:  # First 3 occurrences
+                    start = max(0, match.start() - 100)
+                    end = min(len(text), match.end() + 100)
+                    context = text[start:end].strip()
+                    _add({
+                        "anomaly_type": "suspicious_keyword",
+                        "keyword": keyword,
+                        "context": context,
+                        "position": match.start(),
+                        "severity": "high" if keyword in HIGH_SEVERITY_KEYWORDS else "medium"
+                    })
+        found_risk_phrases = [p for p in RISK_PHRASES if p in text_lower]
+
     if found_suspicious:
         analysis_parts.append(f"Found {len(found_suspicious)} suspicious keyword(s)")
     
-    # 2. Unusual number patterns (potential amounts, IDs, etc.)
-    # Large numbers that might be suspicious
-    large_numbers = re.findall(r'\b\d{6,}\b', text)
-    if len(large_numbers) > 10:
-        anomalies.append({
+    # 2-5. PII-like patterns: one fused regex pass counts large numbers,
+    # emails, credit cards and SSNs together
+    pii_counts = {"cc": 0, "ssn": 0, "email": 0, "num": 0}
+    for match in _PII_RE.finditer(text):
+        pii_counts[match.lastgroup] += 1
+
+    # Unusual number patterns (potential amounts, IDs, etc.)
+    if pii_counts["num"] > 10:
+        _add({
             "anomaly_type": "unusual_number_pattern",
-            "description": f"Found {len(large_numbers)} large numbers (6+ digits)",
+            "description": f"Found {pii_counts['num']} large numbers (6+ digits)",
             "severity": "medium"
         })
-        analysis_parts.append(f"Found {len(large_numbers)} large number patterns")
-    
-    # 3. Email patterns (potential data leaks)
-    emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)
-    if len(emails) > 50:
-        anomalies.append({
+        analysis_parts.append(f"Found {pii_counts['num']} large number patterns")
+
+    # Email patterns (potential data leaks)
+    if pii_counts["email"] > 50:
+        _add({
             "anomaly_type": "excessive_emails",
-            "description": f"Found {len(emails)} email addresses",
-            "count": len(emails),
+            "description": f"Found {pii_counts['email']} email addresses",
+            "count": pii_counts["email"],
             "severity": "medium"
         })
-        analysis_parts.append(f"Found {len(emails)} email addresses")
-    
-    # 4. Credit card patterns (potential security issue)
-    credit_card_patterns = re.findall(r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b', text)
-    if credit_card_patterns:
-        anomalies.append({
+        analysis_parts.append(f"Found {pii_counts['email']} email addresses")
+
+    # Credit card patterns (potential security issue)
+    if pii_counts["cc"]:
+        _add({
             "anomaly_type": "potential_credit_card",
-            "description": f"Found {len(credit_card_patterns)} potential credit card numbers",
-            "count": len(credit_card_patterns),
+            "description": f"Found {pii_counts['cc']} potential credit card numbers",
+            "count": pii_counts["cc"],
             "severity": "high"
         })
-        analysis_parts.append(f"Found {len(credit_card_patterns)} potential credit card numbers")
-    
-    # 5. SSN/ID patterns
-    ssn_patterns = re.findall(r'\b\d{3}-\d{2}-\d{4}\b', text)
-    if ssn_patterns:
-        anomalies.append({
+        analysis_parts.append(f"Found {pii_counts['cc']} potential credit card numbers")
+
+    # SSN/ID patterns
+    if pii_counts["ssn"]:
+        _add({
             "anomaly_type": "potential_ssn",
-            "description": f"Found {len(ssn_patterns)} potential SSN/ID patterns",
-            "count": len(ssn_patterns),
+            "description": f"Found {pii_counts['ssn']} potential SSN/ID patterns",
+            "count": pii_counts["ssn"],
             "severity": "high"
         })
-        analysis_parts.append(f"Found {len(ssn_patterns)} potential SSN patterns")
+        analysis_parts.append(f"Found {pii_counts['ssn']} potential SSN patterns")
     
-    # 6. Unusual text statistics
-    avg_word_length = sum(len(word) for word in words) / len(words) if words else 0
+    # 6-7. Single-character statistics (uppercase, '!', '?', spaces,
+    # whitespace) come out of one vectorized pass over the raw bytes
+    # instead of separate Python-level scans of the string.
+    byte_view = np.frombuffer(text.encode('utf-8', 'ignore'), dtype=np.uint8)
+    caps_count = int(((byte_view >= 65) & (byte_view <= 90)).sum())
+    exclamation_count = int((byte_view == 33).sum())
+    question_count = int((byte_view == 63).sum())
+    double_spaces = int(((byte_view[:-1] == 32) & (byte_view[1:] == 32)).sum())
+    whitespace_count = int(((byte_view == 32) | (byte_view == 10) | (byte_view == 9) | (byte_view == 13)).sum())
+
+    # Unusual text statistics: mean word length is (non-whitespace
+    # chars) / words, which avoids summing len() over every word
+    avg_word_length = (len(byte_view) - whitespace_count) / len(words) if words else 0
     if avg_word_length > 15:
-        anomalies.append({
+        _add({
             "anomaly_type": "unusual_word_length",
             "description": f"Average word length is {avg_word_length:.1f} characters (unusually long)",
             "severity": "low"
         })
-    
-    # 7. Excessive capitalization (potential shouting or emphasis)
-    caps_ratio = sum(1 for c in text if c.isupper()) / len(text) if text else 0
+
+    # Excessive capitalization (potential shouting or emphasis)
+    caps_ratio = caps_count / len(text) if text else 0
     if caps_ratio > 0.3:
-        anomalies.append({
+        _add({
             "anomaly_type": "excessive_capitalization",
             "description": f"{caps_ratio*100:.1f}% of text is capitalized",
             "severity": "low"
         })
         analysis_parts.append("Excessive capitalization detected")
     
-    # 8. Repeated phrases (potential spam or errors)
-    phrase_counts = {}
-    for i in range(len(words) - 2):
-        phrase = ' '.join(words[i:i+3]).lower()
-        phrase_counts[phrase] = phrase_counts.get(phrase, 0) + 1
-    
-    repeated_phrases = {p: c for p, c in phrase_counts.items() if c > 5}
-    if repeated_phrases:
-        anomalies.append({
+    # 8. Repeated phrases (potential spam or errors). Counting trigram
+    # tuples with Counter keeps the loop in C; a phrase can only repeat
+    # more than 5 times with at least 8 words present.
+    repeated_phrase_count = 0
+    if len(words) >= 8:
+        lower_words = [w.lower() for w in words]
+        trigram_counts = Counter(zip(lower_words, lower_words[1:], lower_words[2:]))
+        repeated_phrase_count = sum(1 for c in trigram_counts.values() if c > 5)
+    if repeated_phrase_count:
+        _add({
             "anomaly_type": "repeated_phrases",
-            "description": f"Found {len(repeated_phrases)} frequently repeated phrases",
-            "count": len(repeated_phrases),
+            "description": f"Found {repeated_phrase_count} frequently repeated phrases",
+            "count": repeated_phrase_count,
             "severity": "low"
         })
-        analysis_parts.append(f"Found {len(repeated_phrases)} repeated phrases")
+        analysis_parts.append(f"Found {repeated_phrase_count} repeated phrases")
     
-    # 9. Unusual punctuation patterns
-    exclamation_count = text.count('!')
-    question_count = text.count('?')
+    # 9. Unusual punctuation patterns (counts from the byte pass above)
     if exclamation_count > len(sentences) * 0.5:
-        anomalies.append({
+        _add({
             "anomaly_type": "excessive_exclamations",
             "description": f"Found {exclamation_count} exclamation marks",
             "severity": "low"
         })
     
     # 10. Missing or unusual spacing
-    double_spaces = text.count('  ')
     if double_spaces > len(text) * 0.01:
-        anomalies.append({
+        _add({
             "anomaly_type": "unusual_spacing",
             "description": f"Found {double_spaces} double spaces",
             "severity": "low"
         })
     
-    # 11. Risk-related phrases
-    risk_phrases = [
-        'high risk', 'critical risk', 'immediate action required', 'urgent',
-        'confidential', 'classified', 'restricted', 'internal use only',
-        'do not distribute', 'forbidden', 'prohibited'
-    ]
-    
-    found_risk_phrases = []
-    for phrase in risk_phrases:
-        if phrase.lower() in text_lower:
-            found_risk_phrases.append(phrase)
-            anomalies.append({
-                "anomaly_type": "risk_phrase",
-                "phrase": phrase,
-                "severity": "medium"
-            })
-    
+    # 11. Risk-related phrases (collected during the automaton sweep above)
+    for phrase in found_risk_phrases:
+        _add({
+            "anomaly_type": "risk_phrase",
+            "phrase": phrase,
+            "severity": "medium"
+        })
+
     if found_risk_phrases:
         analysis_parts.append(f"Found {len(found_risk_phrases)} risk-related phrases")
     
@@ -181,13 +288,13 @@ def detect_document_anomalies(text: str, filename: str) -> Dict[str, Any]:
     
     # Very short or very long documents
     if char_count < 100:
-        anomalies.append({
+        _add({
             "anomaly_type": "very_short_document",
             "description": f"Document is very short ({char_count} characters)",
             "severity": "low"
         })
     elif char_count > 1000000:
-        anomalies.append({
+        _add({
             "anomaly_type": "very_long_document",
             "description": f"Document is very long ({char_count:,} characters)",
             "severity": "low"
@@ -203,15 +310,15 @@ def detect_document_anomalies(text: str, filename: str) -> Dict[str, Any]:
     analysis += f" | Stats: {word_count:,} words, {sentence_count:,} sentences, {char_count:,} chars"
     
     return {
-        "has_anomalies": len(anomalies) > 0,
-        "anomalies": anomalies[:50],  # Limit to 50 anomalies
+        "has_anomalies": total_anomalies > 0,
+        "anomalies": anomalies,  # Already capped at _ANOMALY_CAP
         "total_words": word_count,
         "total_sentences": sentence_count,
         "total_characters": char_count,
         "suspicious_keywords_found": len(found_suspicious),
         "analysis": analysis,
-        "anomaly_count": len(anomalies),
-        "high_severity_count": sum(1 for a in anomalies if a.get("severity") == "high"),
-        "medium_severity_count": sum(1 for a in anomalies if a.get("severity") == "medium"),
-        "low_severity_count": sum(1 for a in anomalies if a.get("severity") == "low")
+        "anomaly_count": total_anomalies,
+        "high_severity_count": severity_counts["high"],
+        "medium_severity_count": severity_counts["medium"],
+        "low_severity_count": severity_counts["low"]
     }
@@ -1,29 +1,65 @@
 import os
+import hashlib
 import json
 import logging
+import math
+import pickle
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
 from sentence_transformers import SentenceTransformer
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
 from langchain_community.document_loaders import PyPDFLoader
 import faiss
 import numpy as np
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Let FAISS spread index scans over several cores and surface whether the
+# wheel dispatched to a SIMD build, since the distance kernels are 4-8x
+# faster with AVX2
+try:
+    faiss.omp_set_num_threads(min(8, os.cpu_count() or 1))
+    _faiss_opts = faiss.get_compile_options()
+    if "AVX" not in _faiss_opts:
+        logger.warning(f"FAISS built without AVX ({_faiss_opts}); search will use scalar kernels")
+except AttributeError:
+    pass
+
 # OpenAI client (lazy initialization)
 _openai_client = None
 
 def get_openai_client():
-    """Get or initialize OpenAI client."""
+    """Get or initialize the async OpenAI client."""
     global _openai_client
     if _openai_client is None:
         api_key = os.getenv("OPENAI_API_KEY")
         if api_key:
             try:
-                from openai import OpenAI
-                _openai_client = OpenAI(api_key=api_key)
+                import httpx
+                from openai import AsyncOpenAI
+                # Async client so a generation in flight does not block the
+                # event loop; pooled connections are reused across calls
+                _openai_client = AsyncOpenAI(
+                    api_key=api_key,
+                    http_client=httpx.AsyncClient(
+                        limits=httpx.Limits(max_connections=64)))
                 logger.info("OpenAI client initialized")
             except Exception as e:
                 logger.warning(f"Failed to initialize OpenAI client: {e}")
@@ -45,6 +81,104 @@ _embedding_model = None
 _vector_index = None
 _chunk_metadata = []  # List of {source, page, chunk_id, text}
 
+# Chunk texts live outside the metadata rows as one UTF-8 blob plus an
+# int64 offset table; on load the blob is memory-mapped so chunk text is
+# decoded only for the handful of rows a query touches
+_text_blob = None
+_text_offsets = None
+
+# Sparse lexical index fitted over the chunk texts at build time; scoring
+# retrieved candidates is one sparse matvec instead of Python keyword
+# loops over lowercased chunk text
+_tfidf_vectorizer = None
+_tfidf_matrix = None
+
+# Flat brute-force search is fine for small corpora; above this many
+# chunks an IVF+PQ index gives sub-linear search and ~48x smaller
+# stored vectors (8-byte PQ codes vs 1536-byte float32 for 384 dims)
+_IVFPQ_MIN_VECTORS = 1024
+_IVF_NPROBE = 16
+_PQ_SUBQUANTIZERS = 8
+
+# How many retrieved chunks survive rescoring and feed the answer
+_TOP_CHUNKS = 8
+
+# Persistent embedding cache: a matrix of previously computed chunk
+# vectors plus a (pdf_sha1 + chunk_id) -> row map, so a reindex only
+# re-encodes chunks whose source PDF bytes actually changed
+_EMB_CACHE_NPY = RAG_INDEX_DIR / "emb_cache.npy"
+_EMB_CACHE_DB = RAG_INDEX_DIR / "emb_cache.sqlite"
+
+
+def _file_sha1(path: Path) -> str:
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _load_embedding_cache():
+    """Return (key -> row map, memory-mapped embedding matrix); only the
+    reused rows are ever paged in."""
+    if not (_EMB_CACHE_DB.exists() and _EMB_CACHE_NPY.exists()):
+        return {}, None
+    try:
+        matrix = np.load(_EMB_CACHE_NPY, mmap_mode='r')
+        conn = sqlite3.connect(str(_EMB_CACHE_DB))
+        try:
+            rows = conn.execute("SELECT key, row FROM embeddings").fetchall()
+        finally:
+            conn.close()
+        return {key: row for key, row in rows if row < len(matrix)}, matrix
+    except Exception as e:
+        logger.warning(f"Could not load embedding cache: {e}")
+        return {}, None
+
+
+def _save_embedding_cache(keys: List[str], embeddings: np.ndarray):
+    try:
+        np.save(_EMB_CACHE_NPY, embeddings)
+        conn = sqlite3.connect(str(_EMB_CACHE_DB))
+        try:
+            conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, row INTEGER)")
+            conn.execute("DELETE FROM embeddings")
+            conn.executemany("INSERT INTO embeddings VALUES (?, ?)",
+                             [(key, i) for i, key in enumerate(keys)])
+            conn.commit()
+        finally:
+            conn.close()
+    except Exception as e:
+        logger.warning(f"Could not save embedding cache: {e}")
+
+
+def _make_index(embeddings: np.ndarray):
+    """Build the FAISS index sized to the corpus: flat below
+    _IVFPQ_MIN_VECTORS (PQ training needs enough vectors per centroid),
+    IVF+PQ above it.
+
+    Vectors must be L2-normalized by the caller; the index searches in
+    inner-product space, so returned distances are cosine similarities.
+    """
+    n, dim = embeddings.shape
+    if n < _IVFPQ_MIN_VECTORS:
+        # fp16 storage halves RAM and bytes scanned per query with
+        # negligible recall loss; queries stay float32
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16,
+                                           faiss.METRIC_INNER_PRODUCT)
+        index.train(embeddings)
+        index.add(embeddings)
+        return index
+
+    nlist = max(4, int(4 * math.sqrt(n)))
+    quantizer = faiss.IndexFlatIP(dim)
+    index = faiss.IndexIVFPQ(quantizer, dim, nlist, _PQ_SUBQUANTIZERS, 8,
+                             faiss.METRIC_INNER_PRODUCT)
+    index.train(embeddings)
+    index.add(embeddings)
+    index.nprobe = _IVF_NPROBE
+    return index
+
 
 def get_embedding_model():
     """Get or initialize the embedding model."""
@@ -55,28 +189,124 @@ def get_embedding_model():
     return _embedding_model
 
 
+def warmup():
+    """Eagerly load everything the first query would otherwise pay for:
+    the embedding model (1-3s cold), the on-disk index and the OpenAI
+    client. Called from the app startup warmup task."""
+    model = get_embedding_model()
+    if _vector_index is None:
+        load_index()
+    get_openai_client()
+    # One throwaway encode compiles/caches the tokenizer and model graphs
+    # so the first real question skips the slow first-call path
+    try:
+        model.encode(["warmup"], show_progress_bar=False)
+    except Exception as e:
+        logger.warning(f"Warmup encode failed: {e}")
+
+
+# Chat UIs repeat questions often; caching the normalized query vector
+# skips a full transformer forward pass (~50-200ms on CPU) on hits
+_QUERY_EMBED_CACHE_SIZE = 1024
+_query_embed_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_query_embed_lock = threading.Lock()
+
+
+def _chunk_text(row: int) -> str:
+    """Text of a chunk, from the mapped blob or legacy inline metadata."""
+    if _text_blob is not None and _text_offsets is not None:
+        return bytes(_text_blob[_text_offsets[row]:_text_offsets[row + 1]]).decode('utf-8', 'ignore')
+    return _chunk_metadata[row].get("text", "")
+
+
+def _chunk_snippet(row: int) -> str:
+    chunk = _chunk_metadata[row]
+    if "snippet" in chunk:  # legacy metadata carried precomputed snippets
+        return chunk["snippet"]
+    text = _chunk_text(row)
+    return text[:200] + "..." if len(text) > 200 else text
+
+
+def _encode_query(text: str) -> np.ndarray:
+    """Embed a query as a unit vector, with an LRU over repeated questions."""
+    key = text.strip().lower()
+    with _query_embed_lock:
+        cached = _query_embed_cache.get(key)
+        if cached is not None:
+            _query_embed_cache.move_to_end(key)
+            return cached
+
+    vector = get_embedding_model().encode([text], show_progress_bar=False)[0].astype('float32')
+    vector = np.ascontiguousarray(vector.reshape(1, -1))
+    faiss.normalize_L2(vector)
+
+    with _query_embed_lock:
+        _query_embed_cache[key] = vector
+        if len(_query_embed_cache) > _QUERY_EMBED_CACHE_SIZE:
+            _query_embed_cache.popitem(last=False)
+    return vector
+
+
 def load_index():
     """Load the FAISS index and metadata from disk."""
     global _vector_index, _chunk_metadata
     
     index_path = RAG_INDEX_DIR / "index.faiss"
     metadata_path = RAG_INDEX_DIR / "metadata.json"
-    
-    if index_path.exists() and metadata_path.exists():
+    parquet_path = RAG_INDEX_DIR / "metadata.parquet"
+
+    has_metadata = metadata_path.exists() or (pq is not None and parquet_path.exists())
+    if index_path.exists() and has_metadata:
         try:
             # Convert to absolute path string for Windows compatibility
             # Use resolve() to handle any symlinks or relative paths
             index_path_str = str(index_path.resolve())
-            metadata_path_str = str(metadata_path.resolve())
-            
+
             # Check file size to ensure it's not corrupted
             if index_path.stat().st_size == 0:
                 logger.warning("Index file is empty, will rebuild")
                 return False
             
-            _vector_index = faiss.read_index(index_path_str)
-            with open(metadata_path_str, 'r', encoding='utf-8') as f:
-                _chunk_metadata = json.load(f)
+            # mmap the index so the OS page-caches only the clusters a
+            # query touches; flat/SQ indexes that cannot be mapped fall
+            # back to a full in-RAM load
+            try:
+                _vector_index = faiss.read_index(
+                    index_path_str, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:
+                _vector_index = faiss.read_index(index_path_str)
+            # Indexes from before the cosine switch search in L2 space;
+            # force a rebuild rather than serving miscalibrated scores
+            if getattr(_vector_index, 'metric_type', None) != faiss.METRIC_INNER_PRODUCT:
+                logger.info("Index uses a legacy metric, will rebuild")
+                return False
+            if hasattr(_vector_index, 'nprobe'):
+                _vector_index.nprobe = _IVF_NPROBE
+            # Columnar metadata parses far faster than the JSON list; the
+            # JSON file remains the fallback when pyarrow is unavailable
+            if pq is not None and parquet_path.exists():
+                _chunk_metadata = pq.read_table(str(parquet_path.resolve())).to_pylist()
+            else:
+                raw = metadata_path.read_bytes()
+                _chunk_metadata = orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+            global _tfidf_vectorizer, _tfidf_matrix
+            tfidf_path = RAG_INDEX_DIR / "tfidf.pkl"
+            if tfidf_path.exists():
+                with open(tfidf_path, 'rb') as f:
+                    _tfidf_vectorizer, _tfidf_matrix = pickle.load(f)
+            else:
+                _tfidf_vectorizer = _tfidf_matrix = None
+
+            global _text_blob, _text_offsets
+            text_path = RAG_INDEX_DIR / "text.bin"
+            offsets_path = RAG_INDEX_DIR / "offsets.npy"
+            if text_path.exists() and offsets_path.exists():
+                _text_blob = np.memmap(text_path, dtype=np.uint8, mode='r')
+                _text_offsets = np.fromfile(offsets_path, dtype=np.int64)
+            else:
+                _text_blob = _text_offsets = None  # legacy inline-text metadata
+
             logger.info(f"Loaded index with {len(_chunk_metadata)} chunks")
             return True
         except Exception as e:
@@ -87,6 +317,11 @@ def load_index():
                     index_path.unlink()
                 if metadata_path.exists():
                     metadata_path.unlink()
+                if parquet_path.exists():
+                    parquet_path.unlink()
+                for extra in ("text.bin", "offsets.npy"):
+                    if (RAG_INDEX_DIR / extra).exists():
+                        (RAG_INDEX_DIR / extra).unlink()
                 logger.info("Removed corrupted index files")
             except:
                 pass
@@ -109,13 +344,72 @@ def save_index():
         # Convert to absolute path string for Windows compatibility
         index_path_str = str(index_path.absolute())
         faiss.write_index(_vector_index, index_path_str)
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(_chunk_metadata, f, indent=2, ensure_ascii=False)
+        if pa is not None:
+            pq.write_table(pa.Table.from_pylist(_chunk_metadata),
+                           str((RAG_INDEX_DIR / "metadata.parquet").absolute()))
+        elif orjson is not None:
+            # Machine-read file: compact orjson bytes, no indent
+            metadata_path.write_bytes(orjson.dumps(_chunk_metadata))
+        else:
+            with open(metadata_path, 'w', encoding='utf-8') as f:
+                json.dump(_chunk_metadata, f, ensure_ascii=False)
+
+        if _tfidf_vectorizer is not None and _tfidf_matrix is not None:
+            with open(RAG_INDEX_DIR / "tfidf.pkl", 'wb') as f:
+                pickle.dump((_tfidf_vectorizer, _tfidf_matrix), f)
+
+        if _text_blob is not None and _text_offsets is not None:
+            with open(RAG_INDEX_DIR / "text.bin", 'wb') as f:
+                f.write(_text_blob.tobytes())
+            _text_offsets.tofile(RAG_INDEX_DIR / "offsets.npy")
+
         logger.info(f"Saved index with {len(_chunk_metadata)} chunks")
     except Exception as e:
         logger.error(f"Error saving index: {e}", exc_info=True)
 
 
+# Markers of definition-like sentences (Albanian and English), scanned in
+# one pass instead of a substring search per keyword
+_DEFINITION_RE = re.compile(r'është|is|are|definition|përkufizim|do të thotë|means')
+
+# Sentence boundaries for the extractive answer path
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Chunking parameters (match the previous RecursiveCharacterTextSplitter
+# configuration: 1000 chars, 200 overlap, paragraph > line > sentence breaks)
+_CHUNK_SIZE = 1000
+_CHUNK_OVERLAP = 200
+_CHUNK_BREAKS = ("\n\n", "\n", ". ", " ")
+
+
+def _fast_chunk(text: str, size: int = _CHUNK_SIZE, overlap: int = _CHUNK_OVERLAP) -> List[str]:
+    """Fixed-size splitter that snaps each cut to the latest natural
+    boundary in the window; a tight slicing loop instead of the LangChain
+    splitter's recursive state machine."""
+    stripped = text.strip()
+    if len(text) <= size:
+        return [stripped] if stripped else []
+
+    chunks = []
+    start = 0
+    n = len(text)
+    while start < n:
+        end = min(start + size, n)
+        if end < n:
+            for sep in _CHUNK_BREAKS:
+                cut = text.rfind(sep, start + size // 2, end)
+                if cut != -1:
+                    end = cut + len(sep)
+                    break
+        piece = text[start:end].strip()
+        if piece:
+            chunks.append(piece)
+        if end >= n:
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
 def extract_pdf_with_pages(pdf_path: Path) -> List[Dict[str, Any]]:
     """Extract text from PDF with page numbers."""
     try:
@@ -171,25 +465,30 @@ def build_index():
     
     logger.info(f"Found {len(pdf_files)} PDF files")
     
-    # Initialize text splitter
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-        length_function=len,
-        separators=["\n\n", "\n", ". ", " ", ""]
-    )
-    
-    # Extract and chunk all documents
+    # Extract and chunk all documents; texts are kept in a parallel list
+    # and persisted as one blob rather than inside the metadata rows
     all_chunks = []
+    chunk_texts = []
+    chunk_keys = []
     model = get_embedding_model()
-    
-    for pdf_path in pdf_files:
+
+    # PDF parsing is CPU-bound pure Python, so files extract in parallel
+    # worker processes; chunking and encoding stay on this process to
+    # keep the embedding batches large
+    if len(pdf_files) > 1:
+        workers = min(len(pdf_files), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            extracted = list(pool.map(extract_pdf_with_pages, pdf_files))
+    else:
+        extracted = [extract_pdf_with_pages(pdf_path) for pdf_path in pdf_files]
+
+    for pdf_path, pages in zip(pdf_files, extracted):
         logger.info(f"Processing {pdf_path.name}...")
-        pages = extract_pdf_with_pages(pdf_path)
-        
+        pdf_sha = _file_sha1(pdf_path)
+
         for page_doc in pages:
             # Split page text into chunks
-            chunks = text_splitter.split_text(page_doc["text"])
+            chunks = _fast_chunk(page_doc["text"])
             
             for chunk_idx, chunk_text in enumerate(chunks):
                 if len(chunk_text.strip()) < 50:  # Skip very short chunks
@@ -200,24 +499,69 @@ def build_index():
                     "chunk_id": chunk_id,
                     "source": page_doc["source"],
                     "page": page_doc["page_number"],
-                    "text": chunk_text,
-                    "snippet": chunk_text[:200] + "..." if len(chunk_text) > 200 else chunk_text
                 })
-    
+                chunk_texts.append(chunk_text)
+                chunk_keys.append(f"{pdf_sha}:{chunk_id}")
+
     if not all_chunks:
         logger.warning("No chunks created from PDFs")
         return {"status": "error", "message": "No chunks created"}
     
     logger.info(f"Created {len(all_chunks)} chunks, generating embeddings...")
     
-    # Generate embeddings
-    texts = [chunk["text"] for chunk in all_chunks]
-    embeddings = model.encode(texts, show_progress_bar=True, batch_size=32)
-    
-    # Create FAISS index
-    dimension = embeddings.shape[1]
-    _vector_index = faiss.IndexFlatL2(dimension)
-    _vector_index.add(embeddings.astype('float32'))
+    # Reuse cached embeddings for chunks whose source PDF bytes are
+    # unchanged; only new or changed chunks go through the encoder.
+    # encode() already sorts by length internally so batches have minimal
+    # padding; a larger batch keeps the vector units busy
+    dim = model.get_sentence_embedding_dimension()
+    cache_map, cache_matrix = _load_embedding_cache()
+    if cache_matrix is not None and cache_matrix.shape[1] != dim:
+        cache_map, cache_matrix = {}, None  # embedding model changed
+    to_encode = [i for i, key in enumerate(chunk_keys) if key not in cache_map]
+
+    if len(to_encode) < len(chunk_keys):
+        logger.info(f"Reusing {len(chunk_keys) - len(to_encode)} cached embeddings, "
+                    f"encoding {len(to_encode)} new chunks")
+
+    embeddings = np.empty((len(chunk_keys), dim), dtype='float32')
+    for i, key in enumerate(chunk_keys):
+        row = cache_map.get(key)
+        if row is not None:
+            embeddings[i] = cache_matrix[row]
+    if to_encode:
+        embeddings[to_encode] = model.encode(
+            [chunk_texts[i] for i in to_encode], show_progress_bar=True,
+            batch_size=128, convert_to_numpy=True).astype('float32')
+
+    # Fit the lexical rescorer over the same chunks
+    global _tfidf_vectorizer, _tfidf_matrix
+    try:
+        _tfidf_vectorizer = TfidfVectorizer(lowercase=True, sublinear_tf=True)
+        _tfidf_matrix = _tfidf_vectorizer.fit_transform(chunk_texts)
+    except Exception as e:
+        logger.warning(f"Could not fit TF-IDF rescorer: {e}")
+        _tfidf_vectorizer = _tfidf_matrix = None
+
+    # Pack the texts into one blob + offset table (the query path decodes
+    # individual chunks from this, not from the metadata rows)
+    global _text_blob, _text_offsets
+    encoded_texts = [t.encode('utf-8') for t in chunk_texts]
+    offsets = np.zeros(len(encoded_texts) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded_texts], out=offsets[1:])
+    _text_blob = np.frombuffer(b''.join(encoded_texts), dtype=np.uint8)
+    _text_offsets = offsets
+    del encoded_texts, chunk_texts
+    
+    # Create FAISS index over unit vectors (cosine == inner product).
+    # asarray avoids duplicating the N x d block when encode() already
+    # produced float32, which it does for this model
+    embeddings = np.ascontiguousarray(np.asarray(embeddings, dtype='float32'))
+    faiss.normalize_L2(embeddings)
+    # Persist the (normalized) vectors for the next incremental rebuild;
+    # normalization is idempotent so reused rows round-trip unchanged
+    _save_embedding_cache(chunk_keys, embeddings)
+    _vector_index = _make_index(embeddings)
+    del embeddings
     
     # Store metadata
     _chunk_metadata = all_chunks
@@ -234,7 +578,7 @@ def build_index():
     }
 
 
-def query_rag(question: str, top_k: int = 10) -> Dict[str, Any]:
+async def query_rag(question: str, top_k: int = 10) -> Dict[str, Any]:
     """Query the RAG system and return answer with sources."""
     global _vector_index, _chunk_metadata
     
@@ -243,7 +587,8 @@ def query_rag(question: str, top_k: int = 10) -> Dict[str, Any]:
         if not load_index():
             return {
                 "answer": "No index found. Please reindex the documents first.",
-                "sources": []
+                "sources": [],
+                "error": True
             }
     
     try:
@@ -251,17 +596,17 @@ def query_rag(question: str, top_k: int = 10) -> Dict[str, Any]:
         if _vector_index is None:
             return {
                 "answer": "Index not loaded. Please reindex the documents.",
-                "sources": []
+                "sources": [],
+                "error": True
             }
         
         if not _chunk_metadata:
             return {
                 "answer": "No chunks in metadata. Please reindex the documents.",
-                "sources": []
+                "sources": [],
+                "error": True
             }
         
-        model = get_embedding_model()
-        
         # Generate query embedding - enhance query for better results
         # For "what is X" questions, add synonyms and related terms
         enhanced_question = question
@@ -273,13 +618,13 @@ def query_rag(question: str, top_k: int = 10) -> Dict[str, Any]:
             enhanced_question = f"{question} definition përkufizim explanation shpjegim"
         
         try:
-            query_embedding = model.encode([enhanced_question], show_progress_bar=False)[0].astype('float32')
-            query_embedding = query_embedding.reshape(1, -1)
+            query_embedding = _encode_query(enhanced_question)
         except Exception as e:
             logger.error(f"Error encoding query: {e}", exc_info=True)
             return {
                 "answer": f"Error processing your question: {str(e)}",
-                "sources": []
+                "sources": [],
+                "error": True
             }
         
         # Validate embedding dimensions
@@ -287,7 +632,8 @@ def query_rag(question: str, top_k: int = 10) -> Dict[str, Any]:
             logger.error(f"Dimension mismatch: index={_vector_index.d}, query={query_embedding.shape[1]}")
             return {
                 "answer": "Index dimension mismatch. Please reindex the documents.",
-                "sources": []
+                "sources": [],
+                "error": True
             }
         
         # Search in FAISS index
@@ -295,7 +641,8 @@ def query_rag(question: str, top_k: int = 10) -> Dict[str, Any]:
         if k <= 0:
             return {
                 "answer": "No chunks available in the index.",
-                "sources": []
+                "sources": [],
+                "error": True
             }
         
         try:
@@ -304,55 +651,49 @@ def query_rag(question: str, top_k: int = 10) -> Dict[str, Any]:
             logger.error(f"Error searching FAISS index: {e}", exc_info=True)
             return {
                 "answer": f"Error searching index: {str(e)}. Please try reindexing.",
-                "sources": []
+                "sources": [],
+                "error": True
             }
         
-        # Get relevant chunks and filter by relevance
+        # Keep everything in NumPy until the final top-8 selection: valid
+        # rows, lexical matvec and the blended score are all array ops,
+        # and dicts/text are materialized only for the survivors
+        idx = indices[0]
+        valid = (idx >= 0) & (idx < len(_chunk_metadata))
+        rows = idx[valid].astype(np.int64)
+        sims = np.maximum(distances[0][valid].astype(np.float64), 0.0)
+
+        lexical_scores = np.zeros(len(rows))
+        if len(rows) and _tfidf_vectorizer is not None and _tfidf_matrix is not None:
+            try:
+                query_vec = _tfidf_vectorizer.transform([question])
+                lexical_scores = (_tfidf_matrix[rows] @ query_vec.T).toarray().ravel()
+            except Exception as e:
+                logger.warning(f"TF-IDF rescoring failed: {e}")
+
+        final = np.clip(0.7 * sims + 0.3 * lexical_scores, 0.0, 1.0)
+        if len(final) > _TOP_CHUNKS:
+            survivors = np.argpartition(-final, _TOP_CHUNKS)[:_TOP_CHUNKS]
+        else:
+            survivors = np.arange(len(final))
+        survivors = survivors[np.argsort(-final[survivors], kind='stable')]
+
         sources = []
         chunks_texts = []
-        question_words = set(word.lower() for word in question.split() if len(word) > 2)
-        
-        for idx, (distance, chunk_idx) in enumerate(zip(distances[0], indices[0])):
-            # Handle invalid indices
-            if chunk_idx < 0 or chunk_idx >= len(_chunk_metadata):
-                continue
-            
-            chunk = _chunk_metadata[int(chunk_idx)]
-            chunk_text = chunk["text"].lower()
-            
-            # Calculate relevance score based on distance and keyword matching
-            score = max(0, 1 - (distance / 10))  # Base score from embedding similarity
-            
-            # Boost score if chunk contains question keywords
-            keyword_matches = sum(1 for word in question_words if word in chunk_text)
-            if keyword_matches > 0:
-                score += 0.1 * min(keyword_matches, 3)  # Boost up to 0.3
-            
-            # Boost score for definition-like content
-            definition_keywords = ['përkufizim', 'definition', 'është', 'is', 'means', 'do të thotë', 'refers to']
-            if any(keyword in chunk_text for keyword in definition_keywords):
-                score += 0.2
-            
+        for i in survivors:
+            row = int(rows[i])
+            chunk = _chunk_metadata[row]
             sources.append({
                 "source": chunk["source"],
                 "page": chunk["page"],
-                "snippet": chunk["snippet"],
-                "score": round(min(score, 1.0), 3)  # Cap at 1.0
+                "snippet": _chunk_snippet(row),
+                "score": round(float(final[i]), 3)
             })
-            
-            chunks_texts.append(chunk["text"])
-        
-        # Sort by score and take top chunks
-        if sources and chunks_texts:
-            combined = list(zip(sources, chunks_texts))
-            combined.sort(key=lambda x: x[0]["score"], reverse=True)
-            sources, chunks_texts = zip(*combined) if combined else ([], [])
-            sources = list(sources[:8])  # Take top 8 most relevant
-            chunks_texts = list(chunks_texts[:8])
+            chunks_texts.append(_chunk_text(row))
         
         # Generate answer using OpenAI if available, otherwise use extractive method
         if chunks_texts:
-            answer = generate_answer_with_openai(question, chunks_texts, sources)
+            answer = await generate_answer_with_openai(question, chunks_texts, sources)
         else:
             answer = "I couldn't find relevant information in the documents for your question."
         
@@ -367,11 +708,12 @@ def query_rag(question: str, top_k: int = 10) -> Dict[str, Any]:
         logger.error(f"Error querying RAG: {e}\n{error_details}")
         return {
             "answer": f"Error processing your question: {str(e)}. Please try again or reindex the documents.",
-            "sources": []
+            "sources": [],
+            "error": True
         }
 
 
-def generate_answer_with_openai(question: str, context_chunks: List[str], sources: List[Dict[str, Any]]) -> str:
+async def generate_answer_with_openai(question: str, context_chunks: List[str], sources: List[Dict[str, Any]]) -> str:
     """Generate an intelligent answer using OpenAI based on the retrieved context."""
     client = get_openai_client()
     
@@ -381,13 +723,25 @@ def generate_answer_with_openai(question: str, context_chunks: List[str], source
         return generate_extractive_answer(question, context_chunks, sources)
     
     try:
-        # Combine context chunks with source information
+        # Combine context chunks with source information. Adjacent chunks
+        # share up to 200 chars of overlap from the splitter; dropping
+        # repeated sentences trims prompt tokens without losing content.
+        seen_sentences = set()
         context_parts = []
         for i, (chunk, source) in enumerate(zip(context_chunks[:5], sources[:5]), 1):
+            kept = []
+            for sentence in _SENTENCE_SPLIT_RE.split(chunk):
+                key = sentence.strip().lower()
+                if not key or key in seen_sentences:
+                    continue
+                seen_sentences.add(key)
+                kept.append(sentence.strip())
+            if not kept:
+                continue
             source_name = source.get("source", "Document")
             page = source.get("page", "?")
-            context_parts.append(f"[Source {i}: {source_name}, Page {page}]\n{chunk}")
-        
+            context_parts.append(f"[Source {i}: {source_name}, Page {page}]\n" + " ".join(kept))
+
         context_text = "\n\n".join(context_parts)
         
         # Create a comprehensive prompt
@@ -420,8 +774,8 @@ Please provide a comprehensive, detailed answer based on the context above.
 - Answer naturally and conversationally, without asking clarifying questions
 - Make sure your answer is informative and helpful, not just a brief mention."""
 
-        # Call OpenAI API
-        response = client.chat.completions.create(
+        # Call OpenAI API without blocking the event loop
+        response = await client.chat.completions.create(
             model="gpt-4o-mini",  # Using gpt-4o-mini for cost-effectiveness, can be changed to gpt-4 or gpt-3.5-turbo
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -446,48 +800,32 @@ def generate_extractive_answer(question: str, context_chunks: List[str], sources
     if not context_chunks:
         return "Nuk gjetëm informacion të mjaftueshëm në dokumentet për këtë pyetje."
     
-    # Clean and filter chunks
-    relevant_chunks = []
-    question_lower = question.lower()
-    question_words = set(word.lower() for word in question.split() if len(word) > 2)
-    
-    # Find the most relevant sentences from chunks
-    relevant_sentences = []
-    
-    for chunk in context_chunks[:5]:  # Use top 5 chunks
-        if not chunk or len(chunk.strip()) < 20:
-            continue
-        
-        # Split into sentences
-        sentences = chunk.replace('\n', ' ').split('. ')
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if len(sentence) < 30:  # Skip very short sentences
-                continue
-            
-            sentence_lower = sentence.lower()
-            # Check if sentence contains question words or is relevant
-            sentence_words = set(word.lower() for word in sentence.split() if len(word) > 2)
-            
-            # Calculate relevance: count matching words
-            matches = len(question_words.intersection(sentence_words))
-            
-            # Also check for key terms from question
-            if any(word in sentence_lower for word in question_words if len(word) > 3):
-                matches += 2
-            
-            if matches > 0 or any(keyword in sentence_lower for keyword in ['është', 'is', 'are', 'definition', 'përkufizim', 'do të thotë', 'means']):
-                relevant_sentences.append((sentence, matches))
-    
-    # Sort by relevance
-    relevant_sentences.sort(key=lambda x: x[1], reverse=True)
-    
+    # Split the top chunks into sentences in one regex pass, then score
+    # every sentence against the question with one sparse matvec instead
+    # of per-sentence set intersections
+    blob = ' '.join(chunk.replace('\n', ' ') for chunk in context_chunks[:5]
+                    if chunk and len(chunk.strip()) >= 20)
+    sentences = [s.strip() for s in _SENTENCE_SPLIT_RE.split(blob) if len(s.strip()) >= 30]
+
+    scores = np.zeros(len(sentences))
+    if sentences:
+        try:
+            vectorizer = CountVectorizer(lowercase=True, token_pattern=r'\b\w{3,}\b')
+            term_matrix = vectorizer.fit_transform(sentences + [question])
+            scores = (term_matrix[:-1] @ term_matrix[-1].T).toarray().ravel().astype(float)
+        except ValueError:
+            pass  # No usable vocabulary; fall through to definition scoring
+
+        # Definition-like sentences stay in play even with no word overlap
+        for i, sentence in enumerate(sentences):
+            if _DEFINITION_RE.search(sentence.lower()):
+                scores[i] += 1.0
+
     # Build answer
-    if relevant_sentences:
-        # Take top relevant sentences
-        top_sentences = [s[0] for s in relevant_sentences[:5]]
-        
+    if sentences and scores.max() > 0:
+        order = np.argsort(-scores, kind='stable')
+        top_sentences = [sentences[i] for i in order[:5] if scores[i] > 0]
+
         # Remove duplicates while preserving order
         seen = set()
         unique_sentences = []
@@ -497,11 +835,11 @@ def generate_extractive_answer(question: str, context_chunks: List[str], sources
                 seen.add(sent_key)
                 unique_sentences.append(sent)
         
-        # Combine into answer
-        answer = ". ".join(unique_sentences)
+        # Combine into answer (sentences keep their own punctuation)
+        answer = " ".join(unique_sentences)
         if not answer.endswith('.'):
             answer += "."
-        
+
         # Limit length
         if len(answer) > 800:
             answer = answer[:800] + "..."
@@ -511,11 +849,11 @@ def generate_extractive_answer(question: str, context_chunks: List[str], sources
         # Fallback: use first chunk intelligently
         first_chunk = context_chunks[0]
         # Try to extract first few sentences
-        sentences = first_chunk.replace('\n', ' ').split('. ')
-        relevant = [s.strip() for s in sentences[:3] if len(s.strip()) > 30]
+        first_sentences = _SENTENCE_SPLIT_RE.split(first_chunk.replace('\n', ' '))
+        relevant = [s.strip() for s in first_sentences[:3] if len(s.strip()) > 30]
         
         if relevant:
-            answer = ". ".join(relevant)
+            answer = " ".join(relevant)
             if not answer.endswith('.'):
                 answer += "."
             return answer[:600] + "..." if len(answer) > 600 else answer
@@ -0,0 +1,170 @@
+import hashlib
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SmartRAGCache:
+    """LRU + TTL cache for RAG query results.
+
+    Keys are derived from the normalized question text, the model id,
+    top_k, and an index version that is bumped on reindex so stale
+    answers are never served after the index changes.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.RLock()
+        self._index_version = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def _normalize(question: str) -> str:
+        return " ".join(question.lower().split())
+
+    def make_key(self, question: str, model_id: str = "all-MiniLM-L6-v2", top_k: int = 10) -> str:
+        raw = f"{self._normalize(question)}|{model_id}|{top_k}|{self._index_version}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, value = entry
+            if time.monotonic() > expires_at:
+                del self._entries[key]
+                self._misses += 1
+                return None
+            # Refresh LRU position
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: str, value: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def bump_index_version(self):
+        """Invalidate all entries after a reindex by changing the key space."""
+        with self._lock:
+            self._index_version += 1
+            self._entries.clear()
+            logger.info(f"Query cache invalidated (index version {self._index_version})")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "index_version": self._index_version,
+            }
+
+
+class SemanticCache:
+    """Random-projection LSH cache over query embeddings.
+
+    Second tier below the exact-match cache: semantically equivalent
+    questions hash into the same (or a 1-bit-neighboring) bucket, where a
+    cosine-similarity check against stored embeddings decides whether a
+    cached answer can be reused.
+    """
+
+    def __init__(self, dim: int = 384, num_hyperplanes: int = 16,
+                 max_entries: int = 512, ttl_seconds: float = 3600.0,
+                 similarity_threshold: float = 0.95):
+        self.num_hyperplanes = num_hyperplanes
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        # Fixed seed so bucket assignment is stable across restarts
+        rng = np.random.default_rng(42)
+        self._hyperplanes = rng.standard_normal((num_hyperplanes, dim))
+        self._buckets: Dict[int, List[Tuple[float, np.ndarray, Dict[str, Any]]]] = {}
+        self._size = 0
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+
+    def _hash(self, embedding: np.ndarray) -> int:
+        bits = self._hyperplanes @ embedding > 0
+        return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+    def get(self, embedding: np.ndarray) -> Optional[Dict[str, Any]]:
+        bucket_hash = self._hash(embedding)
+        # Probe the exact bucket plus all 1-bit Hamming neighbors
+        candidates = [bucket_hash] + [bucket_hash ^ (1 << i) for i in range(self.num_hyperplanes)]
+        norm = np.linalg.norm(embedding)
+        now = time.monotonic()
+
+        with self._lock:
+            for candidate in candidates:
+                for expires_at, stored_embedding, value in self._buckets.get(candidate, []):
+                    if now > expires_at:
+                        continue
+                    similarity = embedding @ stored_embedding / (norm * np.linalg.norm(stored_embedding))
+                    if similarity >= self.similarity_threshold:
+                        self._hits += 1
+                        return value
+            self._misses += 1
+            return None
+
+    def set(self, embedding: np.ndarray, value: Dict[str, Any]):
+        bucket_hash = self._hash(embedding)
+        with self._lock:
+            if self._size >= self.max_entries:
+                self._evict_expired()
+            if self._size >= self.max_entries:
+                # Still full: drop everything rather than grow unbounded
+                self.clear()
+            self._buckets.setdefault(bucket_hash, []).append(
+                (time.monotonic() + self.ttl_seconds, np.asarray(embedding), value)
+            )
+            self._size += 1
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for bucket_hash in list(self._buckets):
+            kept = [e for e in self._buckets[bucket_hash] if e[0] > now]
+            self._size -= len(self._buckets[bucket_hash]) - len(kept)
+            if kept:
+                self._buckets[bucket_hash] = kept
+            else:
+                del self._buckets[bucket_hash]
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": self._size,
+                "buckets": len(self._buckets),
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+# Shared cache instances for the chat endpoint
+query_cache = SmartRAGCache()
+semantic_cache = SemanticCache()